@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+from tax_engine import TaxProfile, tax_savings
 
 st.set_page_config(page_title="Mortgage Prepay vs Invest Calculator", layout="wide")
 
@@ -27,6 +28,7 @@ with col2:
     use_auto_shield = st.checkbox("Estimate mortgage tax shield automatically", value=True)
     tax_bracket = st.number_input("Marginal Tax Rate (%)", 0.0, 60.0, 24.0) / 100
     standard_deduction = st.number_input("Standard Deduction ($)", 0, 500000, 30000)
+    deduction_inflation = st.number_input("Standard Deduction Inflation (%/yr)", 0.0, 10.0, 0.0) / 100
     other_itemized = st.number_input("Other Itemized Deductions (excluding mortgage interest) ($)", 0, 1000000, 0)
      # Keep your manual override if helper is off
     mortgage_tax_shield = st.number_input("Mortgage Interest Tax Shield (%)", 0.0, 50.0, 0.0) / 100
@@ -49,7 +51,7 @@ def pmt(rate, nper, pv):
 def amortization_with_tax(
     principal, annual_rate, years, 
     extra_monthly=0, lump_sum=0, lump_month=1,
-    tax_rate=0.0, standard_deduction=0, other_itemized=0
+    tax_rate=0.0, standard_deduction=0, other_itemized=0, deduction_inflation=0.0
 ):
     monthly_rate = annual_rate / 12
     months = years * 12
@@ -90,28 +92,12 @@ def amortization_with_tax(
         "Extra": "sum"
     }).reset_index()
 
-    deduction_type = []
-    tax_savings = []
-    after_tax_cost = []
-
-    for _, row in annual.iterrows():
-        MI = row["Interest"]
-        total_itemized = other_itemized + MI
-        if total_itemized > standard_deduction:
-            deduction_type.append("Itemized")
-            deductible = max(0, min(MI, total_itemized - standard_deduction))
-            savings = deductible * tax_rate
-        else:
-            deduction_type.append("Standard")
-            savings = 0
-        tax_savings.append(savings)
-        after_tax_cost.append(
-            (row["Interest"] + row["Principal"] + row["Extra"]) - savings
-        )
-
-    annual["Deduction_Type"] = deduction_type
-    annual["Tax_Savings"] = tax_savings
-    annual["After_Tax_Cost"] = after_tax_cost
+    profile = TaxProfile(tax_rate, standard_deduction, other_itemized, deduction_inflation)
+    savings, itemized = tax_savings(annual["Interest"].to_numpy(), profile)
+
+    annual["Deduction_Type"] = np.where(itemized, "Itemized", "Standard")
+    annual["Tax_Savings"] = savings
+    annual["After_Tax_Cost"] = annual["Interest"] + annual["Principal"] + annual["Extra"] - savings
     annual["Cumulative_After_Tax_Cost"] = annual["After_Tax_Cost"].cumsum()
 
     return df, annual
@@ -122,13 +108,14 @@ def amortization_with_tax(
 def run_baseline_vs_prepay(
     principal, annual_rate, years,
     extra_monthly=0, lump_sum=0, lump_month=1,
-    tax_rate=0.0, standard_deduction=0, other_itemized=0
+    tax_rate=0.0, standard_deduction=0, other_itemized=0, deduction_inflation=0.0
 ):
     base_df, base_annual = amortization_with_tax(
         principal, annual_rate, years,
         tax_rate=tax_rate,
         standard_deduction=standard_deduction,
-        other_itemized=other_itemized
+        other_itemized=other_itemized,
+        deduction_inflation=deduction_inflation
     )
     prepay_df, prepay_annual = amortization_with_tax(
         principal, annual_rate, years,
@@ -137,7 +124,8 @@ def run_baseline_vs_prepay(
         lump_month=lump_month,
         tax_rate=tax_rate,
         standard_deduction=standard_deduction,
-        other_itemized=other_itemized
+        other_itemized=other_itemized,
+        deduction_inflation=deduction_inflation
     )
 
     return base_df, base_annual, prepay_df, prepay_annual
@@ -195,7 +183,8 @@ base_df, base_annual, prepay_df, prepay_annual = run_baseline_vs_prepay(
     lump_month=lump_month,
     tax_rate=tax_rate,
     standard_deduction=standard_deduction,
-    other_itemized=other_itemized
+    other_itemized=other_itemized,
+    deduction_inflation=deduction_inflation
 )
 
 # Annual table
@@ -239,5 +228,5 @@ chart_df = pd.DataFrame({
     "Baseline Balance": base_df["Balance"]
 })
 chart_df = chart_df.merge(prepay_df[["Month", "Balance"]].rename(columns={"Balance": "Prepay Balance"}), on="Month", how="outer")
-chart_df = chart_df.fillna(method="ffill")
+chart_df = chart_df.ffill()
 st.line_chart(chart_df.set_index("Month"))
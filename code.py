@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+from tax_engine import TaxProfile, tax_savings
 
 st.set_page_config(page_title="Mortgage Prepay vs Invest Calculator", layout="wide")
 
@@ -27,6 +28,7 @@ with col2:
     use_auto_shield = st.checkbox("Estimate mortgage tax shield automatically", value=True)
     tax_bracket = st.number_input("Marginal Tax Rate (%)", 0.0, 60.0, 24.0) / 100
     standard_deduction = st.number_input("Standard Deduction ($)", 0, 500000, 0)
+    deduction_inflation = st.number_input("Standard Deduction Inflation (%/yr)", 0.0, 10.0, 0.0) / 100
     other_itemized = st.number_input("Other Itemized Deductions (excluding mortgage interest) ($)", 0, 1000000, 0)
      # Keep your manual override if helper is off
     mortgage_tax_shield = st.number_input("Mortgage Interest Tax Shield (%)", 0.0, 50.0, 0.0) / 100
@@ -43,7 +45,7 @@ def pmt(rate, nper, pv):
 # Amortization function
 def amortization_with_tax(
     loan, rate, term, extra_monthly=0, lump_sum=0, lump_month=1,
-    tax_rate=0.24, standard_deduction=14600, other_itemized=0
+    tax_rate=0.24, standard_deduction=14600, other_itemized=0, deduction_inflation=0.0
 ):
     import pandas as pd
 
@@ -99,26 +101,12 @@ def amortization_with_tax(
     }).reset_index()
 
     # Tax benefit calculation
-    deduction_type = []
-    tax_savings = []
-    after_tax_cost = []
-
-    for _, row in annual.iterrows():
-        MI = row["Interest"]
-        total_itemized = other_itemized + MI
-        if total_itemized > standard_deduction:
-            deduction_type.append("Itemized")
-            deductible = max(0, min(MI, total_itemized - standard_deduction))
-            savings = deductible * tax_rate
-        else:
-            deduction_type.append("Standard")
-            savings = 0
-        tax_savings.append(savings)
-        after_tax_cost.append((row["Interest"] + row["Principal"] + row["Extra"]) - savings)
-
-    annual["Deduction_Type"] = deduction_type
-    annual["Tax_Savings"] = tax_savings
-    annual["After_Tax_Cost"] = after_tax_cost
+    profile = TaxProfile(tax_rate, standard_deduction, other_itemized, deduction_inflation)
+    savings, itemized = tax_savings(annual["Interest"].to_numpy(), profile)
+
+    annual["Deduction_Type"] = np.where(itemized, "Itemized", "Standard")
+    annual["Tax_Savings"] = savings
+    annual["After_Tax_Cost"] = annual["Interest"] + annual["Principal"] + annual["Extra"] - savings
     annual["Cumulative_After_Tax_Cost"] = annual["After_Tax_Cost"].cumsum()
 
     return df, annual
@@ -131,7 +119,8 @@ def amortization_with_tax(
         lump_month=lump_sum_month,
         tax_rate=tax_bracket,
         standard_deduction=standard_deduction,
-        other_itemized=other_itemized
+        other_itemized=other_itemized,
+        deduction_inflation=deduction_inflation
     )
 
     st.subheader("Annual Summary (After‑Tax)")
@@ -146,36 +135,45 @@ def amortization_with_tax(
         })
     )
 
+def compare_cumulative_after_tax(baseline_annual, prepay_annual):
+    """ Year-by-year cumulative after-tax cost of both scenarios """
+    comparison = baseline_annual[["Year", "Cumulative_After_Tax_Cost"]].merge(
+        prepay_annual[["Year", "Cumulative_After_Tax_Cost"]],
+        on="Year", how="outer", suffixes=(" (Baseline)", " (Prepay)")
+    ).ffill()
+    comparison["Difference"] = (
+        comparison["Cumulative_After_Tax_Cost (Baseline)"] - comparison["Cumulative_After_Tax_Cost (Prepay)"]
+    )
+    return comparison
+
 def run_baseline_vs_prepay(
     loan, rate, term,
     extra_monthly=0, lump_sum=0, lump_month=1,
-    tax_rate=0.24, standard_deduction=14600, other_itemized=0
+    tax_rate=0.24, standard_deduction=14600, other_itemized=0, deduction_inflation=0.0
 ):
     # Baseline run
-    baseline_df, _ = amortization_with_tax(
+    baseline_df, baseline_annual = amortization_with_tax(
         loan, rate, term,
         tax_rate=tax_rate,
         standard_deduction=standard_deduction,
-        other_itemized=other_itemized
+        other_itemized=other_itemized,
+        deduction_inflation=deduction_inflation
     )
-    baseline_monthly = baseline_df["Interest"] + baseline_df["Principal"] + baseline_df["Extra"]
 
     # Prepay run
-    prepay_df, _ = amortization_with_tax(
+    prepay_df, prepay_annual = amortization_with_tax(
         loan, rate, term,
         extra_monthly=extra_monthly,
         lump_sum=lump_sum,
         lump_month=lump_month,
         tax_rate=tax_rate,
         standard_deduction=standard_deduction,
-        other_itemized=other_itemized
+        other_itemized=other_itemized,
+        deduction_inflation=deduction_inflation
     )
-    prepay_monthly = prepay_df["Interest"] + prepay_df["Principal"] + prepay_df["Extra"]
 
     # Comparison
-    comparison_df = compare_cumulative_after_tax(
-        baseline_monthly, prepay_monthly, tax_rate
-    )
+    comparison_df = compare_cumulative_after_tax(baseline_annual, prepay_annual)
 
     return baseline_df, prepay_df, comparison_df
 
@@ -186,7 +184,8 @@ baseline_df, prepay_df, comparison_df = run_baseline_vs_prepay(
     lump_month=lump_sum_month,
     tax_rate=tax_bracket,
     standard_deduction=standard_deduction,
-    other_itemized=other_itemized
+    other_itemized=other_itemized,
+    deduction_inflation=deduction_inflation
 )
 
 st.subheader("Baseline vs. Prepay — Cumulative After‑Tax Cost")
@@ -197,53 +196,44 @@ def add_year_column(df: pd.DataFrame) -> pd.DataFrame:
     d["Year"] = ((d["Month"] - 1) // 12) + 1
     return d
 
-def after_tax_interest_helper(df: pd.DataFrame, tax_rate: float, std_ded: float, other_itemized: float) -> float:
+def after_tax_interest_helper(df: pd.DataFrame, tax_rate: float, std_ded: float, other_itemized: float,
+                              deduction_inflation: float = 0.0) -> float:
     """
     Sum after-tax mortgage interest across years using itemize-vs-standard rule.
     """
     if df.empty:
         return 0.0
     d = add_year_column(df)
-    annual = d.groupby("Year")["Interest"].sum().reset_index()
-    after_tax_total = 0.0
-    for _, row in annual.iterrows():
-        MI = float(row["Interest"])
-        if MI <= 0:
-            continue
-        deductible = max(0.0, min(MI, other_itemized + MI - std_ded))
-        shield_dollars = tax_rate * deductible
-        after_tax_total += MI - shield_dollars
-    return after_tax_total
-
-def effective_avg_shield_rate(df: pd.DataFrame, tax_rate: float, std_ded: float, other_itemized: float) -> float:
+    MI = d.groupby("Year")["Interest"].sum().to_numpy()
+    savings, _ = tax_savings(MI, TaxProfile(tax_rate, std_ded, other_itemized, deduction_inflation))
+    return float((MI - savings)[MI > 0].sum())
+
+def effective_avg_shield_rate(df: pd.DataFrame, tax_rate: float, std_ded: float, other_itemized: float,
+                              deduction_inflation: float = 0.0) -> float:
     """
     Weighted-average effective tax shield rate across the whole schedule.
     """
     total_MI = float(df["Interest"].sum())
     if total_MI <= 0:
         return 0.0
-    after_tax = after_tax_interest_helper(df, tax_rate, std_ded, other_itemized)
+    after_tax = after_tax_interest_helper(df, tax_rate, std_ded, other_itemized, deduction_inflation)
     eff_rate = 1.0 - (after_tax / total_MI)
     return max(0.0, min(1.0, eff_rate))
 
-# Run scenarios
-base_df = amortization(loan_amount, annual_rate, term_years)
-prepay_df = amortization(
-    loan_amount, annual_rate, term_years,
-    extra_payment, lump_sum, lump_sum_month
-)
+# Run scenarios (schedules from run_baseline_vs_prepay above)
+base_df = baseline_df
 
 # Interest savings (after tax)
 base_interest = base_df["Interest"].sum()
 prepay_interest = prepay_df["Interest"].sum()
 
 if use_auto_shield:
-    base_interest_after_tax = after_tax_interest_helper(base_df, tax_bracket, standard_deduction, other_itemized)
-    prepay_interest_after_tax = after_tax_interest_helper(prepay_df, tax_bracket, standard_deduction, other_itemized)
+    base_interest_after_tax = after_tax_interest_helper(base_df, tax_bracket, standard_deduction, other_itemized, deduction_inflation)
+    prepay_interest_after_tax = after_tax_interest_helper(prepay_df, tax_bracket, standard_deduction, other_itemized, deduction_inflation)
 
     # Show the effective average rates that were applied
-    eff_base = effective_avg_shield_rate(base_df, tax_bracket, standard_deduction, other_itemized)
-    eff_prepay = effective_avg_shield_rate(prepay_df, tax_bracket, standard_deduction, other_itemized)
+    eff_base = effective_avg_shield_rate(base_df, tax_bracket, standard_deduction, other_itemized, deduction_inflation)
+    eff_prepay = effective_avg_shield_rate(prepay_df, tax_bracket, standard_deduction, other_itemized, deduction_inflation)
     st.caption(f"Effective average tax shield applied — Baseline: {eff_base:.1%} | Prepay: {eff_prepay:.1%}")
 else:
     base_interest_after_tax = base_interest * (1 - mortgage_tax_shield)
@@ -298,5 +288,5 @@ chart_df = pd.DataFrame({
     "Baseline Balance": base_df["Balance"]
 })
 chart_df = chart_df.merge(prepay_df[["Month", "Balance"]].rename(columns={"Balance": "Prepay Balance"}), on="Month", how="outer")
-chart_df = chart_df.fillna(method="ffill")
+chart_df = chart_df.ffill()
 st.line_chart(chart_df.set_index("Month"))
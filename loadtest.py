@@ -0,0 +1,322 @@
+"""
+Concurrent-session load test for the Streamlit calculators.
+
+Each simulated session loads the app headlessly through Streamlit's AppTest
+(a warm-up run, reported separately as the cold start), then reruns it many
+times after nudging a random widget to a random value (the same thing a user
+poking at the inputs does).
+
+Two modes:
+  processes  every session gets its own process, so CPU time and memory
+             (peak RSS above an idle baseline) are per session (default)
+  threads    all sessions share one process and the GIL. Less reliable:
+             AppTest is not thread-safe (each run installs, then clears, a
+             process-global mock Runtime), so a session's script thread can
+             die with "Runtime hasn't been created!" and the rerun is
+             counted as an error after waiting out --timeout. Memory is only
+             available per run here (--tracemalloc adds the traced Python
+             heap), and per-session CPU relies on patching a private
+             Streamlit class, falling back to process CPU if that changes.
+
+    python loadtest.py Code1.py --sessions 20 --reruns 25 --p95-ms 400
+
+Reruns that raise are counted as errors and left out of the percentiles.
+Exits with status 1 when a latency percentile exceeds its budget or when
+there are more errors than --max-errors allows.
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+APPS = ["code.py", "Code1.py", "CodeRewrite.py"]
+
+# --- Random widget changes ---
+def randomize_number_input(widget, rng):
+    lo = widget.min if widget.min is not None else 0
+    hi = widget.max if widget.max is not None else lo + 100
+    if isinstance(widget.value, int) and isinstance(lo, int) and isinstance(hi, int):
+        widget.set_value(rng.randint(lo, hi))
+    else:
+        widget.set_value(round(rng.uniform(lo, hi), 4))
+
+def randomize_widget(at, rng):
+    """ Change one randomly chosen widget; returns its label (or None) """
+    widgets = [("number", w) for w in at.number_input] + [("checkbox", w) for w in at.checkbox]
+    if not widgets:
+        return None
+    kind, widget = rng.choice(widgets)
+    if kind == "number":
+        randomize_number_input(widget, rng)
+    else:
+        widget.set_value(not widget.value)
+    return widget.label
+
+# --- Per-thread CPU accounting ---
+_script_cpu = threading.local()
+
+def install_script_cpu_probe():
+    """
+    AppTest executes every rerun on a fresh ScriptRunner thread, so the
+    session thread's own thread_time() misses the script's work. Record each
+    script thread's CPU time and credit it to the session thread that ran it.
+    Returns False, patching nothing, if this Streamlit lacks the hooks.
+    """
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    if getattr(LocalScriptRunner, "_cpu_probe_installed", False):
+        return True
+    # Private API; a Streamlit release may rename these
+    if not all(callable(getattr(LocalScriptRunner, name, None)) for name in ("_run_script_thread", "run")):
+        return False
+    run_script_thread = LocalScriptRunner._run_script_thread
+    run = LocalScriptRunner.run
+
+    def probed_run_script_thread(self):
+        start = time.thread_time()
+        try:
+            run_script_thread(self)
+        finally:
+            self._script_cpu_seconds = time.thread_time() - start
+
+    def probed_run(self, *args, **kwargs):
+        try:
+            return run(self, *args, **kwargs)
+        finally:
+            # run() joins the script thread, so its CPU time is final here
+            _script_cpu.seconds = getattr(_script_cpu, "seconds", 0.0) + getattr(self, "_script_cpu_seconds", 0.0)
+
+    LocalScriptRunner._run_script_thread = probed_run_script_thread
+    LocalScriptRunner.run = probed_run
+    LocalScriptRunner._cpu_probe_installed = True
+    return True
+
+def session_thread_cpu():
+    """ CPU seconds used by the calling session thread and its script threads """
+    return time.thread_time() + getattr(_script_cpu, "seconds", 0.0)
+
+# --- One simulated session ---
+def timed_run(at):
+    """ (milliseconds, ok) for one at.run() """
+    start = time.perf_counter()
+    try:
+        at.run()
+    except Exception:
+        # Timeouts and harness errors; at.exception may be left over from
+        # the previous run, so it is only consulted after a completed run
+        ok = False
+    else:
+        ok = not at.exception
+    return (time.perf_counter() - start) * 1000, ok
+
+def drive_session(session_id, app, reruns, seed, timeout, cpu_clock):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed + session_id)
+    at = AppTest.from_file(app, default_timeout=timeout)
+
+    # Warm-up: the first run compiles the script and fills caches
+    cold_start_ms, ok = timed_run(at)
+    errors = 0 if ok else 1
+
+    latencies = []
+    cpu_start = cpu_clock()
+    for _ in range(reruns):
+        randomize_widget(at, rng)
+        ms, ok = timed_run(at)
+        if ok:
+            latencies.append(ms)
+        else:
+            errors += 1
+    cpu_seconds = cpu_clock() - cpu_start
+
+    return {
+        "session": session_id,
+        "cold_start_ms": cold_start_ms,
+        "latencies_ms": latencies,
+        "errors": errors,
+        "cpu_seconds": cpu_seconds,
+    }
+
+def max_rss_mb():
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run_session_process(args):
+    """ Runs in a fresh worker process; returns that session's measurements """
+    # Import what every app imports before taking the idle baseline, so the
+    # reported memory is the session's own and not the interpreter's
+    import pandas  # noqa: F401
+    from streamlit.testing.v1 import AppTest  # noqa: F401
+
+    baseline_mb = max_rss_mb()
+    result = drive_session(*args, cpu_clock=time.process_time)
+    result["memory_mb"] = max_rss_mb() - baseline_mb
+    return result
+
+# --- Runners ---
+def run_processes(jobs, concurrency):
+    # maxtasksperchild=1 so every session starts in a clean process and its
+    # CPU/RSS numbers are not polluted by earlier sessions
+    with mp.get_context("spawn").Pool(concurrency, maxtasksperchild=1) as pool:
+        results = pool.map(run_session_process, jobs, chunksize=1)
+    return results, {"cpu_scope": "session", "memory_scope": "session"}
+
+def run_threads(jobs, concurrency, trace_memory):
+    import pandas  # noqa: F401
+    from streamlit.testing.v1 import AppTest  # noqa: F401
+
+    if install_script_cpu_probe():
+        cpu_clock, cpu_scope = session_thread_cpu, "session"
+    else:
+        cpu_clock, cpu_scope = time.process_time, "process"
+    baseline_mb = max_rss_mb()
+    if trace_memory:
+        tracemalloc.start()
+        traced_baseline = tracemalloc.get_traced_memory()[0]
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(lambda job: drive_session(*job, cpu_clock=cpu_clock), jobs))
+
+    # Neither RSS nor tracemalloc can tell threads apart, so memory is per run
+    run_info = {"cpu_scope": cpu_scope, "memory_scope": "run",
+                "rss_peak_mb": max_rss_mb() - baseline_mb, "traced_peak_mb": None}
+    if trace_memory:
+        run_info["traced_peak_mb"] = (tracemalloc.get_traced_memory()[1] - traced_baseline) / 2**20
+        tracemalloc.stop()
+    return results, run_info
+
+# --- Reporting ---
+def percentiles(values):
+    if not values:
+        return None
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": float(p50), "p95": float(p95), "p99": float(p99)}
+
+def summarize(app, mode, results, run_info):
+    all_latencies = [ms for r in results for ms in r["latencies_ms"]]
+    return {
+        "app": app,
+        "mode": mode,
+        "sessions": len(results),
+        "timed_reruns": len(all_latencies),
+        "errors": sum(r["errors"] for r in results),
+        "latency_ms": percentiles(all_latencies),
+        "cold_start_ms": percentiles([r["cold_start_ms"] for r in results]),
+        **run_info,
+        "per_session": [
+            {
+                "session": r["session"],
+                "latency_ms": percentiles(r["latencies_ms"]),
+                "cold_start_ms": r["cold_start_ms"],
+                "errors": r["errors"],
+                "cpu_seconds": r["cpu_seconds"],
+                "memory_mb": r.get("memory_mb"),
+            }
+            for r in sorted(results, key=lambda r: r["session"])
+        ],
+    }
+
+def fmt(value, width, digits=1):
+    return f"{value:>{width}.{digits}f}" if value is not None else f"{'-':>{width}}"
+
+def latency_columns(lat):
+    lat = lat or {}
+    return " ".join(fmt(lat.get(p), 9) for p in ("p50", "p95", "p99"))
+
+def print_summary(summary):
+    print(f"\n--- {summary['app']} ({summary['mode']}) ---")
+    print(f"{'Session':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'Cold ms':>9} {'CPU s':>8} {'Mem MB':>8} {'Errors':>6}")
+    for s in summary["per_session"]:
+        print(f"{s['session']:>7} {latency_columns(s['latency_ms'])} {fmt(s['cold_start_ms'], 9)} "
+              f"{fmt(s['cpu_seconds'], 8, 2)} {fmt(s['memory_mb'], 8)} {s['errors']:>6}")
+    cold = summary["cold_start_ms"] or {}
+    print(f"{'All':>7} {latency_columns(summary['latency_ms'])} {fmt(cold.get('p50'), 9)} "
+          f"{'':>8} {'':>8} {summary['errors']:>6}")
+    if summary["cpu_scope"] == "process":
+        print("Note: Streamlit's LocalScriptRunner hooks are missing; CPU s is whole-process CPU, not per session")
+    if summary["memory_scope"] == "run":
+        sessions = summary["sessions"]
+        print("Note: per-session memory is not available in threads mode; use --mode processes")
+        print(f"RSS peak above idle baseline: {summary['rss_peak_mb']:.1f} MB for the run "
+              f"(~{summary['rss_peak_mb'] / sessions:.1f} MB/session on average)")
+        if summary["traced_peak_mb"] is not None:
+            print(f"Traced Python heap peak: {summary['traced_peak_mb']:.1f} MB for the run "
+                  f"(~{summary['traced_peak_mb'] / sessions:.1f} MB/session; latencies inflated by tracing)")
+
+def budget_violations(summary, budgets, max_errors):
+    """ List of human-readable messages for every budget that was exceeded """
+    violations = []
+    if summary["errors"] > max_errors:
+        violations.append(f"{summary['app']}: {summary['errors']} failed runs exceeds --max-errors {max_errors}")
+    for name, limit in budgets.items():
+        if limit is None or summary["latency_ms"] is None:
+            continue
+        actual = summary["latency_ms"][name]
+        if actual > limit:
+            violations.append(f"{summary['app']}: {name} {actual:.1f} ms exceeds budget {limit:.1f} ms")
+    return violations
+
+# --- Driver ---
+def run_load_test(app, mode, sessions, concurrency, reruns, seed, timeout, trace_memory):
+    jobs = [(i, app, reruns, seed, timeout) for i in range(sessions)]
+    if mode == "processes":
+        results, run_info = run_processes(jobs, concurrency or mp.cpu_count())
+    else:
+        results, run_info = run_threads(jobs, concurrency or sessions, trace_memory)
+    return summarize(app, mode, results, run_info)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the Streamlit calculators with concurrent simulated sessions.")
+    parser.add_argument("apps", nargs="*", default=APPS, help="app scripts to drive (default: all three)")
+    parser.add_argument("--mode", choices=["processes", "threads"], default="processes",
+                        help="isolate each session in its own process, or share one process (less reliable, see above)")
+    parser.add_argument("--sessions", type=int, default=10, help="simulated sessions per app")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="sessions running at once (default: CPU count in processes mode, all of them in threads mode)")
+    parser.add_argument("--reruns", type=int, default=20, help="randomized reruns per session, after the warm-up run")
+    parser.add_argument("--seed", type=int, default=0, help="base random seed")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds allowed per rerun")
+    parser.add_argument("--tracemalloc", dest="trace_memory", action="store_true",
+                        help="also trace the Python heap in threads mode (slows every allocation, so latencies rise)")
+    parser.add_argument("--p50-ms", type=float, default=None, help="p50 latency budget")
+    parser.add_argument("--p95-ms", type=float, default=None, help="p95 latency budget")
+    parser.add_argument("--p99-ms", type=float, default=None, help="p99 latency budget")
+    parser.add_argument("--max-errors", type=int, default=0, help="failed runs allowed per app")
+    parser.add_argument("--json", dest="json_path", default=None, help="also write the full report here")
+    args = parser.parse_args(argv)
+
+    budgets = {"p50": args.p50_ms, "p95": args.p95_ms, "p99": args.p99_ms}
+    summaries = []
+    violations = []
+    for app in args.apps:
+        # AppTest resolves relative paths against the caller's file, not the cwd
+        summary = run_load_test(os.path.abspath(app), args.mode, args.sessions, args.concurrency,
+                                args.reruns, args.seed, args.timeout, args.trace_memory)
+        summary["app"] = app
+        print_summary(summary)
+        summaries.append(summary)
+        violations += budget_violations(summary, budgets, args.max_errors)
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"budgets_ms": budgets, "max_errors": args.max_errors, "apps": summaries}, f, indent=2)
+
+    if violations:
+        print("\nBudget exceeded:")
+        for v in violations:
+            print(f"  {v}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())